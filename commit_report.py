@@ -3,20 +3,57 @@
 
 import argparse
 import datetime
+import hashlib
 import logging
 import os
+import pickle
 import re
 import subprocess
 import sys
-from typing import Dict, List, Set
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from dataclasses import asdict, dataclass
 import lib.notify
 
+# One line per commit: abbreviated hash, strict ISO 8601 committer date and
+# subject, separated by tabs.
+LOG_FORMAT = '%h%x09%cI%x09%s'
+
+# Matches the committer date of each line of LOG_FORMAT output, e.g.
+# 1a2b3c4\t2019-10-27T21:04:11-07:00\tFix typo
+_COMMIT_DATE_RE = re.compile(r'^\S+\t(\d{4})-(\d{2})-(\d{2})T', re.M)
+
+# Only this much history is read for each repo. calculate_streak goes back to
+# the full history in the rare case the streak is longer than this.
+HISTORY_DAYS = 90
+
+# Repos are scanned concurrently. The work is dominated by waiting on git
+# subprocesses, so use more threads than cores, but cap the count so a large
+# repos_dir doesn't exhaust file descriptors with concurrent pipes.
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Size of the slices objects are read in when counting lines.
+_COUNT_CHUNK_SIZE = 1 << 20
+
+# Results of _is_git_repo, keyed by absolute path and ask_git. Whether a
+# directory is a repo doesn't change during a run.
+_IS_GIT_REPO_CACHE: Dict[Tuple[str, bool], bool] = {}
+
+# Repos are cached here, keyed by path, and reused while HEAD hasn't moved.
+# Entries are pickled, which is fine for a directory only the user can write.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'commit_report')
+
+
+class NotAGitRepositoryError(ValueError):
+    """Raised when a directory that should be a git repository isn't one."""
+
 
 @dataclass
-class Repo:
+class Repo:  # pylint: disable=too-many-instance-attributes
     """A class representing a collection of git repos."""
     name: str
+    path: str
     commits_from_last_day: str
     commits_from_last_week: str
     commits: str
@@ -34,6 +71,12 @@ class Repo:
         'Assembly': ['.s', '.asm']
     }
 
+    EXTENSION_LANGUAGES = {
+        ext: lang
+        for lang, extensions in SUPPORTED_LANGUAGES.items()
+        for ext in extensions
+    }
+
     @classmethod
     def from_directory(cls, repo_dir: str) -> 'Repo':
         """Create a Repo instance from a directory path.
@@ -42,31 +85,50 @@ class Repo:
             A new Repo instance
 
         Raises:
-            ValueError: If the directory is not a git repository
+            NotAGitRepositoryError: If the directory is not a git repository
         """
         abs_repo_dir = os.path.abspath(repo_dir)
 
         if not _is_git_repo(abs_repo_dir):
-            raise ValueError(f"Directory '{repo_dir}' is not a git repository")
+            raise NotAGitRepositoryError(
+                f"Directory '{repo_dir}' is not a git repository")
+
+        commits = _run_git_command([
+            'git', 'log', f'--since={HISTORY_DAYS} days ago',
+            f'--pretty=format:{LOG_FORMAT}'
+        ], abs_repo_dir)
+        line_counts = cls._compute_line_counts(abs_repo_dir)
+
+        return cls.from_log(abs_repo_dir, commits, line_counts)
+
+    @classmethod
+    def from_log(cls, path: str, commits: str,
+                 line_counts: Dict[str, int]) -> 'Repo':
+        """Create a Repo instance from already collected git data.
 
-        os.chdir(abs_repo_dir)
-        name = os.path.basename(abs_repo_dir)
+        The last day and last week activity is derived relative to now.
+
+        Args:
+            path: Absolute path of the repo
+            commits: git log output produced with LOG_FORMAT
+            line_counts: Mapping of language name to number of lines
+
+        Returns:
+            A new Repo instance
+        """
+        log_entries = _parse_log(commits)
 
-        commits_from_last_day = _run_git_command(
-            'git log --oneline --since="1 day ago"')
-        commits_from_last_week = _run_git_command(
-            'git log --oneline --since="7 days ago"')
-        commits = _run_git_command('git log --date=short')
+        now = datetime.datetime.now(datetime.timezone.utc)
+        commits_from_last_day = _format_commits_since(
+            log_entries, now - datetime.timedelta(days=1))
+        commits_from_last_week = _format_commits_since(
+            log_entries, now - datetime.timedelta(days=7))
 
         commit_count_from_last_day = commits_from_last_day.count('\n')
         commit_count_from_last_week = commits_from_last_week.count('\n')
 
-        line_counts = {}
-        for lang, extensions in cls.SUPPORTED_LANGUAGES.items():
-            line_counts[lang] = sum(
-                _count_lines_by_extension(ext) for ext in extensions)
-
-        return cls(name=name,
+        return cls(name=os.path.basename(path),
+                   path=path,
                    commits_from_last_day=commits_from_last_day,
                    commits_from_last_week=commits_from_last_week,
                    commits=commits,
@@ -74,6 +136,46 @@ class Repo:
                    commit_count_from_last_week=commit_count_from_last_week,
                    line_counts=line_counts)
 
+    @classmethod
+    def _compute_line_counts(cls, repo_dir: str) -> Dict[str, int]:
+        """Count lines of code per supported language in a repo.
+
+        Lists the tracked files of the supported extensions with a single git
+        invocation, letting git do the filtering, and counts them in one
+        pass. Lines are counted in the staged blobs rather than the files on
+        disk, and cached by blob sha, so only blobs that haven't been seen
+        before are read.
+
+        Args:
+            repo_dir: Absolute path of the repo
+
+        Returns:
+            Mapping of language name to number of lines
+        """
+        pathspecs = [f'*{ext}' for ext in cls.EXTENSION_LANGUAGES]
+
+        cached_counts = _load_line_count_cache(repo_dir)
+        blob_counts = {}
+        line_counts = dict.fromkeys(cls.SUPPORTED_LANGUAGES, 0)
+        with ExitStack() as stack:
+            session = None
+            for sha, path in _tracked_blobs(repo_dir, pathspecs):
+                lang = cls.EXTENSION_LANGUAGES.get(os.path.splitext(path)[1])
+                if not lang:
+                    continue
+                if sha in cached_counts:
+                    blob_counts[sha] = cached_counts[sha]
+                elif sha not in blob_counts:
+                    if session is None:
+                        session = stack.enter_context(_GitSession(repo_dir))
+                    blob_counts[sha] = session.count_lines(sha)
+                line_counts[lang] += blob_counts[sha]
+
+        # Only keep blobs that are still tracked so the cache doesn't grow.
+        if blob_counts != cached_counts:
+            _save_line_count_cache(repo_dir, blob_counts)
+        return line_counts
+
     def __str__(self) -> str:
         """String representation of the repository."""
         return (
@@ -85,59 +187,380 @@ class Repo:
             f"line_counts: {self.line_counts})")
 
 
-def _is_git_repo(directory: str) -> bool:
+def _tracked_blobs(repo_dir: str,
+                   pathspecs: List[str]) -> Iterator[Tuple[str, str]]:
+    """List the staged blobs of a repo.
+
+    Bare repos have no index, so the blobs of HEAD are listed instead.
+
+    Args:
+        repo_dir: Absolute path of the repo
+        pathspecs: Limits the listing to matching paths in a work tree; bare
+            repos are listed in full because git ls-tree doesn't take globs
+
+    Returns:
+        (blob sha, path) pairs
+    """
+    has_work_tree = os.path.exists(os.path.join(repo_dir, '.git'))
+    if not has_work_tree and _is_bare_repo(repo_dir):
+        yield from _head_blobs(repo_dir)
+        return
+
+    tracked_files = subprocess.run(['git', 'ls-files', '-s', '-z', '--'] +
+                                   pathspecs,
+                                   capture_output=True,
+                                   check=True,
+                                   cwd=repo_dir).stdout
+    for entry in tracked_files.split(b'\0'):
+        if not entry:
+            continue
+        # Example entry from git ls-files -s:
+        # 100644 3b18e512dba79e4c8300dd08aeb37f8e728b8dad 0\tsrc/main.py
+        info, raw_path = entry.split(b'\t', 1)
+        mode, sha, stage = info.decode('ascii').split()
+        # Skip submodules, and the extra stages of unmerged paths.
+        if mode != '160000' and stage == '0':
+            yield sha, os.fsdecode(raw_path)
+
+
+def _head_blobs(repo_dir: str) -> Iterator[Tuple[str, str]]:
+    """List the blobs of a repo's HEAD commit.
+
+    Args:
+        repo_dir: Absolute path of the repo
+
+    Returns:
+        (blob sha, path) pairs
+    """
+    tree = subprocess.run(['git', 'ls-tree', '-r', '-z', 'HEAD'],
+                          capture_output=True,
+                          check=True,
+                          cwd=repo_dir).stdout
+    for entry in tree.split(b'\0'):
+        if not entry:
+            continue
+        # Example entry from git ls-tree:
+        # 100644 blob 3b18e512dba79e4c8300dd08aeb37f8e728b8dad\tsrc/main.py
+        info, raw_path = entry.split(b'\t', 1)
+        _, object_type, sha = info.decode('ascii').split()
+        if object_type == 'blob':
+            yield sha, os.fsdecode(raw_path)
+
+
+class _GitSession:
+    """A long-running git cat-file --batch process for one repo.
+
+    Looking up many objects through a single process avoids spawning git for
+    each lookup. Any per-commit or per-object queries should go through a
+    session rather than individual git show/rev-parse calls.
+    """
+
+    def __init__(self, repo_dir: str):
+        # The process outlives this call; close() reaps it.
+        # pylint: disable-next=consider-using-with
+        self._process = subprocess.Popen(['git', 'cat-file', '--batch'],
+                                         stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE,
+                                         cwd=repo_dir)
+
+    def _request(self, object_name: str) -> Tuple[str, Optional[int]]:
+        """Ask for an object and read the header of the reply.
+
+        Returns:
+            The header, and the size of the contents that follow it, or None
+            if the object doesn't exist
+        """
+        self._process.stdin.write(os.fsencode(object_name) + b'\n')
+        self._process.stdin.flush()
+        header = os.fsdecode(self._process.stdout.readline()).rstrip('\n')
+        if header.endswith(' missing'):
+            return header, None
+        return header, int(header.rsplit(' ', 1)[1])
+
+    def _read_contents(self, size: int) -> Iterator[bytes]:
+        """Read the contents of an object in slices of bounded size."""
+        remaining = size
+        while remaining:
+            chunk = self._process.stdout.read(min(remaining,
+                                                  _COUNT_CHUNK_SIZE))
+            if not chunk:
+                raise EOFError('git cat-file exited mid-object')
+            remaining -= len(chunk)
+            yield chunk
+        # Each object's contents are followed by a newline.
+        self._process.stdout.read(1)
+
+    def query(self, object_name: str) -> str:
+        """Look up an object.
+
+        Args:
+            object_name: Anything git rev-parse accepts, e.g. a sha or HEAD
+
+        Returns:
+            "<sha> <type> <size>", or "<object_name> missing" if the object
+            doesn't exist
+        """
+        header, size = self._request(object_name)
+        if size is not None:
+            for _ in self._read_contents(size):
+                pass
+        return header
+
+    def count_lines(self, object_name: str) -> int:
+        """Count the lines in an object.
+
+        Args:
+            object_name: Anything git rev-parse accepts, e.g. a blob sha
+
+        Returns:
+            Number of newline characters in the object, or 0 if it doesn't
+            exist
+        """
+        _, size = self._request(object_name)
+        if size is None:
+            return 0
+        return sum(chunk.count(b'\n') for chunk in self._read_contents(size))
+
+    def close(self):
+        """Stop the git process."""
+        self._process.stdin.close()
+        self._process.wait()
+        self._process.stdout.close()
+
+    def __enter__(self) -> '_GitSession':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _is_git_repo(directory: str, ask_git: bool = False) -> bool:
     """Check if a directory is a git repository.
 
     Args:
         directory: Path to check
+        ask_git: Whether to ask git about directories without a .git entry,
+            which also recognizes subdirectories of a work tree
 
     Returns:
         True if the directory is a git repository, False otherwise
     """
-    current_dir = os.getcwd()
+    key = (os.path.abspath(directory), ask_git)
+    if key not in _IS_GIT_REPO_CACHE:
+        _IS_GIT_REPO_CACHE[key] = _check_git_repo(key[0], ask_git)
+    return _IS_GIT_REPO_CACHE[key]
+
+
+def _check_git_repo(directory: str, ask_git: bool) -> bool:
+    """Uncached implementation of _is_git_repo."""
+    # The top level of a work tree has a .git directory, or a .git file for
+    # submodules and linked worktrees. Either is cheap to check without
+    # spawning git.
+    if os.path.exists(os.path.join(directory, '.git')):
+        return True
+    if _is_bare_repo(directory):
+        return True
+    if not ask_git:
+        return False
     try:
-        os.chdir(directory)
-        subprocess.check_output('git rev-parse --is-inside-work-tree',
-                                shell=True,
-                                text=True)
-        result = True
+        # Prints "false" twice rather than failing inside the .git directory
+        # of a work tree.
+        answers = _run_git_command([
+            'git', 'rev-parse', '--is-inside-work-tree', '--is-bare-repository'
+        ], directory).split()
+        return 'true' in answers
     except subprocess.CalledProcessError:
-        result = False
-    finally:
-        os.chdir(current_dir)
-    return result
+        return False
+
+
+def _is_bare_repo(directory: str) -> bool:
+    """Check if a directory has the layout of a bare repository.
 
+    Args:
+        directory: Path to check
+
+    Returns:
+        True if the directory looks like a bare repository, False otherwise
+    """
+    return (os.path.isfile(os.path.join(directory, 'HEAD'))
+            and os.path.isdir(os.path.join(directory, 'objects'))
+            and os.path.isdir(os.path.join(directory, 'refs')))
 
-def _run_git_command(command: str) -> str:
+
+def _run_git_command(command: List[str], cwd: str) -> str:
     """Run a git command and return its output.
 
     Args:
-        command: Git command to run
+        command: Git command to run, as a list of arguments
+        cwd: Directory to run the command in
 
     Returns:
         Command output as a string
     """
-    return str(subprocess.check_output(command, shell=True, text=True))
+    # Decode without text=True, which would turn a carriage return inside a
+    # commit subject into a line break.
+    return subprocess.check_output(command, cwd=cwd).decode('utf-8', 'replace')
+
+
+def _parse_log(commits: str) -> List[Tuple[str, datetime.datetime, str]]:
+    """Parse git log output produced with LOG_FORMAT.
+
+    Args:
+        commits: Output of git log
+
+    Returns:
+        List of (abbreviated hash, committer date, subject) tuples
+    """
+    log_entries = []
+    # Subjects can contain characters that splitlines() also breaks on, such
+    # as form feeds and U+2028, so split on newlines only.
+    for line in commits.split('\n'):
+        if not line:
+            continue
+        sha, committer_date, subject = line.split('\t', 2)
+        log_entries.append(
+            (sha, datetime.datetime.fromisoformat(committer_date), subject))
+    return log_entries
+
+
+def _format_commits_since(log_entries: List[Tuple[str, datetime.datetime,
+                                                  str]],
+                          cutoff: datetime.datetime) -> str:
+    """Format the commits made since a cutoff like git log --oneline.
+
+    Args:
+        log_entries: Parsed log, as returned by _parse_log
+        cutoff: Earliest committer date to include
+
+    Returns:
+        One line per commit, each terminated by a newline
+    """
+    return ''.join(f'{sha} {subject}\n'
+                   for sha, committer_date, subject in log_entries
+                   if committer_date >= cutoff)
+
+
+def _cache_path(repo_dir: str, suffix: str = '') -> str:
+    """Get the path of a cache file for a repo.
+
+    Args:
+        repo_dir: Absolute path of the repo
+        suffix: Distinguishes the kinds of cache files kept for a repo
+
+    Returns:
+        Path of the cache file
+    """
+    key = hashlib.sha1(repo_dir.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f'{key}{suffix}.pickle')
+
+
+def _load_line_count_cache(repo_dir: str) -> Dict[str, int]:
+    """Load the cached line counts of a repo's blobs.
+
+    Args:
+        repo_dir: Absolute path of the repo
+
+    Returns:
+        Mapping of blob sha to number of lines, empty if there's no cache
+    """
+    try:
+        with open(_cache_path(repo_dir, '-lines'), 'rb') as f:
+            cached_counts = pickle.load(f)
+        if isinstance(cached_counts, dict):
+            return cached_counts
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        pass
+    return {}
+
+
+def _save_line_count_cache(repo_dir: str, blob_counts: Dict[str, int]):
+    """Save the line counts of a repo's blobs.
+
+    Args:
+        repo_dir: Absolute path of the repo
+        blob_counts: Mapping of blob sha to number of lines
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(_cache_path(repo_dir, '-lines'), 'wb') as f:
+            pickle.dump(blob_counts, f, protocol=5)
+    except OSError as e:
+        logging.warning('Unable to cache line counts of %s: %s', repo_dir, e)
+
+
+def _load_cached(repo_dir: str, head: str) -> Optional[Repo]:
+    """Load a cached Repo if it was built at the current HEAD.
+
+    Args:
+        repo_dir: Absolute path of the repo
+        head: Current HEAD sha of the repo
+
+    Returns:
+        The cached Repo, or None if there's no usable cache entry
+    """
+    try:
+        with open(_cache_path(repo_dir), 'rb') as f:
+            entry = pickle.load(f)
+        if entry['head'] != head:
+            return None
+        cached = entry['repo']
+        # The activity windows are relative to now, so they are rebuilt from
+        # the cached log rather than taken from the cache.
+        return Repo.from_log(repo_dir, cached['commits'],
+                             cached['line_counts'])
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, KeyError,
+            TypeError):
+        return None
+
+
+def _save_cached(repo_dir: str, head: str, repo: Repo):
+    """Save a Repo to the cache.
+
+    Args:
+        repo_dir: Absolute path of the repo
+        head: HEAD sha the Repo was built at
+        repo: Repo to save
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        entry = {'head': head, 'repo': asdict(repo)}
+        with open(_cache_path(repo_dir), 'wb') as f:
+            pickle.dump(entry, f, protocol=5)
+    except OSError as e:
+        logging.warning('Unable to cache %s: %s', repo_dir, e)
+
 
+def _load_repo(repo_dir: str) -> Repo:
+    """Create a Repo for a directory, reusing the cache if HEAD hasn't moved.
 
-def _count_lines_by_extension(file_extension: str) -> int:
-    """Count lines of code for files with a specific extension.
+    Line counts are taken from the cache as long as HEAD is unchanged, so
+    uncommitted edits aren't picked up until the next commit.
 
     Args:
-        file_extension: File extension to count
+        repo_dir: Path of the repo
 
     Returns:
-        Number of lines
+        A Repo instance
+
+    Raises:
+        NotAGitRepositoryError: If the directory is not a git repository
     """
+    abs_repo_dir = os.path.abspath(repo_dir)
+    if not _is_git_repo(abs_repo_dir):
+        raise NotAGitRepositoryError(
+            f"Directory '{repo_dir}' is not a git repository")
     try:
-        return int(
-            subprocess.check_output(
-                # The \\ becomes a single \ in the actual shell command.
-                f'git ls-files | grep \'\\{file_extension}$\' | xargs cat | wc -l',
-                shell=True,
-                text=True))
+        head = _run_git_command(['git', 'rev-parse', 'HEAD'],
+                                abs_repo_dir).strip()
     except subprocess.CalledProcessError:
-        return 0
+        # A repo without commits; let from_directory report it.
+        return Repo.from_directory(repo_dir)
+
+    repo = _load_cached(abs_repo_dir, head)
+    if repo is None:
+        repo = Repo.from_directory(repo_dir)
+        _save_cached(abs_repo_dir, head, repo)
+    return repo
 
 
 def get_repositories(repos_dir: str) -> List[Repo]:
@@ -149,51 +572,94 @@ def get_repositories(repos_dir: str) -> List[Repo]:
         Returns:
             List of Repo instances
     """
+    with os.scandir(repos_dir) as entries:
+        repo_paths = [entry.path for entry in entries if entry.is_dir()]
+
     repos = []
-    original_dir = os.getcwd()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(_load_repo, repo_path): repo_path
+            for repo_path in repo_paths
+        }
+        for future in as_completed(futures):
+            logging.debug('Checked directory %s', futures[future])
+            try:
+                repos.append(future.result())
+            except NotAGitRepositoryError:
+                logging.warning('Skipping %s: not a git repository',
+                                futures[future])
+            except Exception:
+                logging.error('Failed to read repo %s', futures[future])
+                raise
+
+    # Repos finish in arbitrary order; keep the report stable between runs.
+    repos.sort(key=lambda repo: repo.name)
+    return repos
 
-    try:
-        dir_iterator = os.scandir(repos_dir)
-        for directory in dir_iterator:
-            if directory.is_dir():
-                repo_path = os.path.join(repos_dir, directory.name)
-                logging.debug('Checkig directory %s', repo_path)
-                try:
-                    repos.append(Repo.from_directory(repo_path))
-                except ValueError as e:
-                    logging.warning(str(e))
-    finally:
-        os.chdir(original_dir)
 
-    return repos
+def _commit_dates(logs: Iterable[str]) -> Set[datetime.date]:
+    """Collect the dates with a commit from git logs.
 
+    Args:
+        logs: git log outputs produced with LOG_FORMAT
 
-def calculate_streak(repos: List[Repo]) -> int:
-    """Calculate consecutive days with a commit startig with the previous day.
+    Returns:
+        Set of committer dates
+    """
+    dates_with_a_commit: Set[datetime.date] = set()
+
+    # One pass over every repo's log instead of a search per line.
+    all_commits = '\n'.join(logs)
+    for match in _COMMIT_DATE_RE.finditer(all_commits):
+        dates_with_a_commit.add(
+            datetime.date(
+                # year
+                int(match.group(1)),
+                # month
+                int(match.group(2)),
+                # day
+                int(match.group(3))))
+
+    return dates_with_a_commit
+
+
+def _stream_commit_dates(repo_dir: str) -> Set[datetime.date]:
+    """Collect the dates with a commit from a repo's full history.
+
+    The log is read as git produces it and only the dates are kept, so the
+    history is never held in memory.
 
     Args:
-        repos: A list of Repo instances
+        repo_dir: Absolute path of the repo
 
     Returns:
-        Number of consecutive days with a commit
+        Set of committer dates
+
+    Raises:
+        subprocess.CalledProcessError: If git log fails
     """
+    command = ['git', 'log', '--pretty=format:%cs']
     dates_with_a_commit: Set[datetime.date] = set()
+    with subprocess.Popen(command,
+                          stdout=subprocess.PIPE,
+                          text=True,
+                          cwd=repo_dir) as process:
+        for line in process.stdout:
+            dates_with_a_commit.add(datetime.date.fromisoformat(line.strip()))
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return dates_with_a_commit
 
-    for repo in repos:
-        for line in repo.commits.splitlines():
-            # Example date from git log --date=short:
-            # Date:   2019-10-27
-            match = re.search(r'^Date:\s.*(\d{4})-(\d+)-(\d+)', line)
-            if match:
-                dates_with_a_commit.add(
-                    datetime.date(
-                        # year
-                        int(match.group(1)),
-                        # month
-                        int(match.group(2)),
-                        # day
-                        int(match.group(3))))
 
+def _count_streak(dates_with_a_commit: Set[datetime.date]) -> int:
+    """Count consecutive days in a set of dates starting with the previous day.
+
+    Args:
+        dates_with_a_commit: Dates to check
+
+    Returns:
+        Number of consecutive days
+    """
     date_to_check = datetime.date.today() - datetime.timedelta(1)
     count = 0
 
@@ -204,6 +670,30 @@ def calculate_streak(repos: List[Repo]) -> int:
     return count
 
 
+def calculate_streak(repos: List[Repo]) -> int:
+    """Calculate consecutive days with a commit startig with the previous day.
+
+    Args:
+        repos: A list of Repo instances
+
+    Returns:
+        Number of consecutive days with a commit
+    """
+    count = _count_streak(_commit_dates(repo.commits for repo in repos))
+
+    # The oldest day of the loaded history may only be partially covered, so
+    # a streak reaching it could continue further back.
+    if count >= HISTORY_DAYS - 1:
+        logging.debug('Streak reaches %d days, reading full history',
+                      HISTORY_DAYS)
+        dates_with_a_commit: Set[datetime.date] = set()
+        for repo in repos:
+            dates_with_a_commit.update(_stream_commit_dates(repo.path))
+        count = _count_streak(dates_with_a_commit)
+
+    return count
+
+
 def generate_report(repos: List[Repo]) -> str:
     """Generate the commit report.
 
@@ -246,8 +736,8 @@ def generate_report(repos: List[Repo]) -> str:
                 cumulative_line_counts[language] += count
 
         report.append("Total current lines (across all repos) of...")
-        for language, count in cumulative_line_counts.items():
-            report.append(f"{language}: {count}")
+        report.extend(f"{language}: {count}"
+                      for language, count in cumulative_line_counts.items())
 
     return "\n".join(report)
 
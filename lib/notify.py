@@ -6,6 +6,43 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 
+class MailSession:
+    """A logged in connection to gmail that can send several messages.
+
+    Use as a context manager so that the connection is closed:
+
+        with MailSession(gmail_username, app_password) as session:
+            for msg in messages:
+                session.send(msg)
+    """
+
+    def __init__(self, gmail_username, app_password):
+        self._user = gmail_username + '@gmail.com'
+        self._app_password = app_password
+        self._server = None
+
+    def __enter__(self):
+        self._server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
+        try:
+            self._server.login(self._user, self._app_password)
+        except Exception:
+            self._server.close()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self._server.quit()
+        except smtplib.SMTPServerDisconnected:
+            pass
+        finally:
+            self._server.close()
+
+    def send(self, msg):
+        """Send a message, taking the envelope addresses from its headers."""
+        self._server.send_message(msg)
+
+
 def mail(gmail_username, app_password, email_subject, email_body):
     """Send mail via gmail."""
     msg = MIMEMultipart('alternative')
@@ -15,6 +52,5 @@ def mail(gmail_username, app_password, email_subject, email_body):
 
     msg.attach(MIMEText(email_body, 'plain'))
 
-    with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-        server.login(user, app_password)
-        server.sendmail(user, user, msg.as_string())
+    with MailSession(gmail_username, app_password) as session:
+        session.send(msg)
@@ -6,6 +6,7 @@ import datetime
 import logging
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 import lib.notify
 
 
@@ -41,8 +42,13 @@ def generate_report() -> str:
     Returns:
         Report contents as a string
     """
-    sections = [("Disk Usage", get_disk_usage()),
-                ("System Uptime", get_uptime())]
+    # The commands are independent, and df can block on a stalled mount, so
+    # don't make uptime wait on it.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        disk_usage = executor.submit(get_disk_usage)
+        uptime = executor.submit(get_uptime)
+        sections = [("Disk Usage", disk_usage.result()),
+                    ("System Uptime", uptime.result())]
 
     report_parts = []
     for title, content in sections:
@@ -1,12 +1,15 @@
 #!/usr/bin/python3
 """Tests for commit_report."""
 
+import datetime
 import os
 import shutil
 import tempfile
 import unittest
 import subprocess
-from commit_report import Repo
+from unittest.mock import ANY, patch
+from commit_report import (NotAGitRepositoryError, Repo, _GitSession,
+                           _is_git_repo, calculate_streak, get_repositories)
 
 
 class RepoTests(unittest.TestCase):
@@ -35,6 +38,12 @@ class RepoTests(unittest.TestCase):
 
         self.original_dir = os.getcwd()
 
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache_patcher = patch('commit_report.CACHE_DIR', cache_dir)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
     def tearDown(self):
         """Clean up after tests."""
         os.chdir(self.original_dir)
@@ -48,12 +57,244 @@ class RepoTests(unittest.TestCase):
         except ValueError:
             self.fail("Repo initialization raised ValueError unexpectedly!")
 
+    def test_commit_windows(self):
+        """Test that commits are bucketed by committer date."""
+        old_date = (datetime.datetime.now(datetime.timezone.utc) -
+                    datetime.timedelta(days=10)).isoformat()
+        env = dict(os.environ,
+                   GIT_AUTHOR_DATE=old_date,
+                   GIT_COMMITTER_DATE=old_date)
+        subprocess.run(["git", "commit", "--allow-empty", "-m", "Old commit"],
+                       check=True,
+                       env=env)
+        subprocess.run(["git", "commit", "--allow-empty", "-m", "New commit"],
+                       check=True)
+
+        repo = Repo.from_directory(self.git_repo_dir)
+        self.assertEqual(repo.commit_count_from_last_day, 2)
+        self.assertEqual(repo.commit_count_from_last_week, 2)
+        self.assertIn("New commit", repo.commits_from_last_week)
+        self.assertNotIn("Old commit", repo.commits_from_last_week)
+
+    def test_subject_with_line_separators(self):
+        """Test that subjects with unusual line separators are kept whole."""
+        subject = "Pasted\u2028text\x0cwith\rbreaks"
+        subprocess.run(["git", "commit", "--allow-empty", "-m", subject],
+                       check=True)
+
+        repo = Repo.from_directory(self.git_repo_dir)
+        self.assertEqual(repo.commit_count_from_last_day, 2)
+        self.assertIn(subject, repo.commits_from_last_day)
+
+    def test_line_counts(self):
+        """Test that lines are counted per language for tracked files."""
+        with open(os.path.join(self.git_repo_dir, "main.go"),
+                  "w",
+                  encoding='utf-8') as f:
+            f.write("package main\n\nfunc main() {}\n")
+        with open(os.path.join(self.git_repo_dir, "untracked.sh"),
+                  "w",
+                  encoding='utf-8') as f:
+            f.write("echo hi\n")
+        os.mkdir(os.path.join(self.git_repo_dir, "src"))
+        with open(os.path.join(self.git_repo_dir, "src", "util.py"),
+                  "w",
+                  encoding='utf-8') as f:
+            f.write("import os\nimport sys\n")
+        subprocess.run(["git", "add", "main.go", "src/util.py"], check=True)
+
+        repo = Repo.from_directory(self.git_repo_dir)
+        self.assertEqual(repo.line_counts["Golang"], 3)
+        self.assertEqual(repo.line_counts["Python"], 2)
+        self.assertEqual(repo.line_counts["Bash"], 0)
+
+    def test_line_counts_cached_by_blob(self):
+        """Test that unchanged files aren't read again."""
+        Repo.from_directory(self.git_repo_dir)
+        with open(os.path.join(self.git_repo_dir, "other.py"),
+                  "w",
+                  encoding='utf-8') as f:
+            f.write("a = 1\nb = 2\n")
+        subprocess.run(["git", "add", "other.py"], check=True)
+
+        other_sha = subprocess.check_output(["git", "rev-parse", ":other.py"],
+                                            text=True).strip()
+
+        with patch.object(_GitSession,
+                          'count_lines',
+                          autospec=True,
+                          side_effect=_GitSession.count_lines) as mock_count:
+            repo = Repo.from_directory(self.git_repo_dir)
+        mock_count.assert_called_once_with(ANY, other_sha)
+        self.assertEqual(repo.line_counts["Python"], 2)
+
+    def test_line_counts_ignore_unstaged_edits(self):
+        """Test that unstaged edits don't leak into the cached counts."""
+        path = os.path.join(self.git_repo_dir, "f.py")
+        with open(path, "w", encoding='utf-8') as f:
+            f.write("a = 1\nb = 2\n")
+        subprocess.run(["git", "add", "f.py"], check=True)
+        subprocess.run(["git", "commit", "-m", "Add f.py"], check=True)
+
+        with open(path, "a", encoding='utf-8') as f:
+            f.write("c = 3\nd = 4\ne = 5\n")
+        repo = Repo.from_directory(self.git_repo_dir)
+        self.assertEqual(repo.line_counts["Python"], 2)
+
+        subprocess.run(["git", "checkout", "f.py"], check=True)
+        repo = Repo.from_directory(self.git_repo_dir)
+        self.assertEqual(repo.line_counts["Python"], 2)
+
     def test_non_git_directory(self):
-        """Test that a non-git directory raises a ValueError."""
-        with self.assertRaises(ValueError) as context:
+        """Test that a non-git directory raises NotAGitRepositoryError."""
+        with self.assertRaises(NotAGitRepositoryError) as context:
             Repo.from_directory(self.non_git_dir)
         self.assertIn("is not a git repository", str(context.exception))
 
+    def test_linked_worktree(self):
+        """Test that a worktree with a .git file is a git repo."""
+        worktree_dir = os.path.join(self.test_dir, "worktree")
+        subprocess.run(["git", "worktree", "add", worktree_dir], check=True)
+        self.assertTrue(os.path.isfile(os.path.join(worktree_dir, ".git")))
+
+        repo = Repo.from_directory(worktree_dir)
+        self.assertEqual(repo.name, "worktree")
+
+    def test_bare_repo(self):
+        """Test that a bare repo is a git repo."""
+        with open(os.path.join(self.git_repo_dir, "test.py"),
+                  "a",
+                  encoding='utf-8') as f:
+            f.write("\n")
+        subprocess.run(["git", "commit", "-am", "Add newline"], check=True)
+        bare_dir = os.path.join(self.test_dir, "bare.git")
+        subprocess.run(["git", "clone", "--bare", self.git_repo_dir, bare_dir],
+                       check=True)
+
+        repo = Repo.from_directory(bare_dir)
+        self.assertEqual(repo.name, "bare.git")
+        self.assertEqual(repo.commit_count_from_last_day, 2)
+        self.assertEqual(repo.line_counts["Python"], 1)
+
+    def test_is_git_repo_is_cached(self):
+        """Test that a directory is only examined once per run."""
+        self.assertTrue(_is_git_repo(self.git_repo_dir))
+        with patch('commit_report._check_git_repo') as mock_check:
+            self.assertTrue(_is_git_repo(self.git_repo_dir))
+        mock_check.assert_not_called()
+
+    def test_subdirectory_needs_ask_git(self):
+        """Test that only git itself recognizes a work tree subdirectory."""
+        subdirectory = os.path.join(self.git_repo_dir, "sub")
+        os.mkdir(subdirectory)
+        self.assertFalse(_is_git_repo(subdirectory))
+        self.assertTrue(_is_git_repo(subdirectory, ask_git=True))
+        self.assertFalse(_is_git_repo(self.non_git_dir, ask_git=True))
+
+    def test_bare_repo_subdirectory_needs_ask_git(self):
+        """Test that git recognizes a directory inside a bare repo."""
+        bare_dir = os.path.join(self.test_dir, "bare.git")
+        subprocess.run(["git", "init", "--bare", bare_dir], check=True)
+        refs_dir = os.path.join(bare_dir, "refs")
+        self.assertFalse(_is_git_repo(refs_dir))
+        self.assertTrue(_is_git_repo(refs_dir, ask_git=True))
+        self.assertFalse(
+            _is_git_repo(os.path.join(self.git_repo_dir, ".git", "refs"),
+                         ask_git=True))
+
+    def test_get_repositories(self):
+        """Test that only git repos are collected from the repos dir."""
+        cwd = os.getcwd()
+        repos = get_repositories(self.test_dir)
+        self.assertEqual([repo.name for repo in repos], ["valid_repo"])
+        self.assertEqual(os.getcwd(), cwd)
+
+    def test_get_repositories_names_skipped_directory(self):
+        """Test that a skipped directory is named in the warning."""
+        with self.assertLogs(level='WARNING') as logs:
+            get_repositories(self.test_dir)
+        self.assertEqual(logs.output, [
+            f"WARNING:root:Skipping {self.non_git_dir}: not a git repository"
+        ])
+
+    def test_get_repositories_reports_failing_repo(self):
+        """Test that errors other than a missing repo aren't skipped."""
+        with patch.object(Repo, 'from_log', side_effect=ValueError("bad log")):
+            with self.assertLogs(level='ERROR') as logs:
+                with self.assertRaises(ValueError) as context:
+                    get_repositories(self.test_dir)
+        self.assertNotIsInstance(context.exception, NotAGitRepositoryError)
+        self.assertEqual(
+            logs.output,
+            [f"ERROR:root:Failed to read repo {self.git_repo_dir}"])
+
+    def test_git_session(self):
+        """Test that a git session answers repeated object lookups."""
+        head = subprocess.check_output(["git", "rev-parse", "HEAD"],
+                                       text=True).strip()
+        with _GitSession(self.git_repo_dir) as session:
+            self.assertTrue(session.query("HEAD").startswith(head + " commit"))
+            self.assertEqual(session.query("no-such-ref"),
+                             "no-such-ref missing")
+            self.assertTrue(session.query(head).startswith(head))
+
+    def test_get_repositories_uses_cache(self):
+        """Test that an unchanged HEAD is served from the cache."""
+        get_repositories(self.test_dir)
+
+        with patch.object(Repo, 'from_directory',
+                          wraps=Repo.from_directory) as mock_from_directory:
+            repos = get_repositories(self.test_dir)
+        mock_from_directory.assert_not_called()
+        self.assertEqual(repos[0].commit_count_from_last_day, 1)
+
+        subprocess.run(["git", "commit", "--allow-empty", "-m", "Another"],
+                       check=True)
+        repos = get_repositories(self.test_dir)
+        self.assertEqual(repos[0].commit_count_from_last_day, 2)
+
+    def test_streak_longer_than_loaded_history(self):
+        """Test that a streak past HISTORY_DAYS reads the full history."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for days_ago in range(5, 0, -1):
+            commit_date = (now - datetime.timedelta(days_ago)).isoformat()
+            env = dict(os.environ,
+                       GIT_AUTHOR_DATE=commit_date,
+                       GIT_COMMITTER_DATE=commit_date)
+            subprocess.run(
+                ["git", "commit", "--allow-empty", "-m", f"Day {days_ago}"],
+                check=True,
+                env=env)
+
+        with patch('commit_report.HISTORY_DAYS', 3):
+            repo = Repo.from_directory(self.git_repo_dir)
+            self.assertEqual(calculate_streak([repo]), 5)
+
+
+class CalculateStreakTests(unittest.TestCase):
+    """Tests for calculate_streak."""
+
+    @staticmethod
+    def _repo_with_commits_on(name, days_ago):
+        today = datetime.date.today()
+        commits = "\n".join(
+            f"abc{days}\t{today - datetime.timedelta(days)}T12:00:00+00:00\t"
+            f"Commit {days}" for days in days_ago)
+        return Repo.from_log(name, commits, {})
+
+    def test_streak_across_repos(self):
+        """Test that consecutive days are counted across all repos."""
+        repos = [
+            self._repo_with_commits_on("a", [1, 3]),
+            self._repo_with_commits_on("b", [2, 5]),
+        ]
+        self.assertEqual(calculate_streak(repos), 3)
+
+    def test_no_commit_yesterday(self):
+        """Test that the streak is zero without a commit yesterday."""
+        repos = [self._repo_with_commits_on("a", [0, 2, 3])]
+        self.assertEqual(calculate_streak(repos), 0)
+
 
 if __name__ == "__main__":
     unittest.main()